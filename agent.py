@@ -1,10 +1,14 @@
 # agent.py
-import time, json, os, threading, shutil
-from fastapi import FastAPI, Request
+import asyncio
+import time, os, threading
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Dict, Any
-import math, datetime
+from typing import Any, Dict
+import math
 import httpx
+import numpy as np
+import orjson
 
 # Config
 SIMULATOR_BASE = os.environ.get("SIMULATOR_BASE", "http://localhost:5001")
@@ -12,47 +16,127 @@ WORKFLOW_FILE = "workflow.json"
 VERSIONS_DIR = "workflow_versions"
 os.makedirs(VERSIONS_DIR, exist_ok=True)
 
-app = FastAPI()
+class ORJSONResponse(JSONResponse):
+    """JSONResponse backed by orjson — skips jsonable_encoder re-encoding."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Shared HTTP client: keep-alive pooling avoids a fresh handshake per call
+_CLIENT = httpx.AsyncClient(
+    base_url=SIMULATOR_BASE,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=3.0,
+)
+
+@app.on_event("shutdown")
+async def _close_client():
+    await _CLIENT.aclose()
 
 # Simple in-memory metrics store
+WINDOW = 30  # sliding window size (events)
+
 METRICS = {
-    "window": [],
+    # SoA ring buffers: latencies and error flags live in contiguous
+    # pre-allocated arrays so reductions run as C loops, not Python ones
+    "lat": np.zeros(WINDOW, dtype=np.float32),
+    "err": np.zeros(WINDOW, dtype=np.uint8),
+    "idx": 0,
+    "n": 0,
     "error_count": 0,
-    "total_count": 0
+    "total_count": 0,
+    # running stats over the window: updated on ingest, read in O(1) by
+    # analyze_metrics instead of re-scanning the window each cycle
+    "sum": 0.0,
+    "sumsq": 0.0,
+    # EWMA of the window mean/std (influence factor k): smoother than the
+    # raw 30-point z-score and updated online, one step per ingested event
+    "mu_r": 0.0,
+    "sigma_r": 0.0,
+    "k": 0.1,
+    # bumped after each remediation; gen_mark records total_count at the
+    # bump so analyze_metrics only weighs events ingested since, and while
+    # adapt_left > 0 the EWMA uses a larger influence to re-converge
+    "generation": 0,
+    "gen_mark": 0,
+    "adapt_left": 0,
 }
+K_FAST = 0.3  # post-remediation EWMA influence
+
+# Load workflow (cached on mtime: the file rarely changes between cycles,
+# so steady-state calls skip the read + parse entirely)
+_WF_CACHE = {"mtime": 0, "wf": None, "by_type": {}, "last": None, "blob": b"null"}
+
+def _index_workflow(wf):
+    # dispatch table: step lookup by type becomes a dict hit instead of a
+    # linear scan of workflow["steps"] on every cycle
+    steps = wf.get("steps", [])
+    _WF_CACHE["by_type"] = {s["type"]: s for s in steps}
+    _WF_CACHE["last"] = steps[-1] if steps else None
+    # pre-encoded workflow bytes: /status splices these instead of
+    # re-serializing the workflow on every dashboard poll
+    _WF_CACHE["blob"] = orjson.dumps(wf)
 
-# Load workflow
 def load_workflow():
-    with open(WORKFLOW_FILE, "r") as f:
-        return json.load(f)
+    st = os.stat(WORKFLOW_FILE)
+    if st.st_mtime_ns == _WF_CACHE["mtime"]:
+        return _WF_CACHE["wf"]
+    with open(WORKFLOW_FILE, "rb") as f:
+        wf = orjson.loads(f.read())
+    _WF_CACHE["mtime"] = st.st_mtime_ns
+    _WF_CACHE["wf"] = wf
+    _index_workflow(wf)
+    return wf
 
 def save_workflow(wf):
-    with open(WORKFLOW_FILE, "w") as f:
-        json.dump(wf, f, indent=2)
+    # the live file is machine-read only: write compact JSON in one
+    # unbuffered syscall (snapshots keep indentation for humans)
+    fd = os.open(WORKFLOW_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    try:
+        os.write(fd, orjson.dumps(wf))
+    finally:
+        os.close(fd)
+    # refresh the cache so the write isn't re-parsed on the next load
+    _WF_CACHE["mtime"] = os.stat(WORKFLOW_FILE).st_mtime_ns
+    _WF_CACHE["wf"] = wf
+    _index_workflow(wf)
 
-def snapshot_workflow(reason):
+def snapshot_workflow(reason, wf):
     """Save copy of workflow with timestamp and reason."""
-    ts = datetime.datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    src = WORKFLOW_FILE
+    ts = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
     dest = os.path.join(VERSIONS_DIR, f"{ts}__{reason.replace(' ', '_')}.json")
-    shutil.copyfile(src, dest)
+    # write straight from the in-memory dict — no re-read of workflow.json
+    with open(dest, "wb") as f:
+        f.write(orjson.dumps(wf, option=orjson.OPT_INDENT_2))
     print("Snapshot saved:", dest)
 
 # Simple anomaly detector (z-score on latency and error rate)
-def analyze_metrics(window):
-    # window: list of dicts {latency_ms, level}
-    latencies = [w.get("metric", {}).get("latency_ms", 0) for w in window if "metric" in w]
-    error_flags = [1 if w.get("state")=="crashed" or w.get("level")=="error" else 0 for w in window]
-    if not latencies:
+def analyze_metrics():
+    # Pure read over the ring buffers: ingest_log keeps the EWMA mean/std
+    # (mu_r/sigma_r) up to date and the error rate is one SIMD reduction.
+    # Only events from the current generation count — ring slots from
+    # before the last remediation must not re-trigger the same spike.
+    fresh = METRICS["total_count"] - METRICS["gen_mark"]
+    m = min(METRICS["n"], fresh)
+    if m == 0:
         return {"anomaly": False}
-    mean = sum(latencies)/len(latencies)
-    var = sum((x-mean)**2 for x in latencies)/len(latencies)
-    std = math.sqrt(var)
-    latest = latencies[-1]
-    z = (latest - mean) / (std+1e-6)
-    error_rate = sum(error_flags)/len(error_flags)
-    anomaly = (z > 2.0) or (error_rate > 0.15)
-    return {"anomaly": anomaly, "z": z, "error_rate": error_rate, "latest_latency": latest, "mean": mean, "std": std}
+    i = METRICS["idx"]
+    latest = float(METRICS["lat"][(i - 1) % WINDOW])
+    z = (latest - METRICS["mu_r"]) / (METRICS["sigma_r"]+1e-6)
+    # count_nonzero on the uint8 view is NumPy's tightest SIMD reduction;
+    # cast to native float so the response stays jsonable_encoder-safe
+    err = METRICS["err"]
+    start = (i - m) % WINDOW
+    if start < i:
+        errors = np.count_nonzero(err[start:i])
+    else:  # the fresh span wraps around the ring
+        errors = np.count_nonzero(err[start:]) + np.count_nonzero(err[:i])
+    error_rate = float(errors) / m
+    anomaly = bool((z > 2.0) or (error_rate > 0.15))
+    return {"anomaly": anomaly, "z": z, "error_rate": error_rate, "latest_latency": latest, "mean": METRICS["mu_r"], "std": METRICS["sigma_r"]}
 
 # Root cause analyzer (simple heuristic reasoning)
 def root_cause_reasoning(analysis):
@@ -63,7 +147,7 @@ def root_cause_reasoning(analysis):
     return "unknown"
 
 # Action executor (safe)
-def execute_action(action, params):
+async def execute_action(action, params):
     # Two safe methods:
     # - http_restart: call simulator's /recover endpoint (safe demo)
     # - docker_restart: attempt to restart container via docker sdk (optional)
@@ -71,7 +155,7 @@ def execute_action(action, params):
     if action == "action_restart_service":
         if method == "http_restart":
             try:
-                r = httpx.get(f"{SIMULATOR_BASE}/recover", timeout=3.0)
+                r = await _CLIENT.get("/recover")
                 return {"ok": True, "detail": "called /recover", "status_code": r.status_code}
             except Exception as e:
                 return {"ok": False, "detail": str(e)}
@@ -81,10 +165,10 @@ def execute_action(action, params):
     return {"ok": False, "detail": "unknown action"}
 
 # Post-check verification
-def verify_recovery(params):
+async def verify_recovery(params):
     check_endpoint = params.get("check_endpoint", "/")
     try:
-        r = httpx.get(f"{SIMULATOR_BASE}{check_endpoint}", timeout=2.0)
+        r = await _CLIENT.get(check_endpoint, timeout=2.0)
         return {"ok": r.status_code == 200, "status_code": r.status_code}
     except Exception as e:
         return {"ok": False, "error": str(e)}
@@ -104,7 +188,7 @@ def reflect_and_evolve(workflow, context):
             if step["type"] == "anomaly_detection":
                 t = step["params"].get("latency_threshold_ms", 300)
                 step["params"]["latency_threshold_ms"] = max(80, int(t * 0.95))
-        snapshot_workflow("improved_after_success")
+        snapshot_workflow("improved_after_success", workflow)
         save_workflow(workflow)
         return {"evolved": True, "note": "lowered latency threshold"}
     else:
@@ -117,12 +201,13 @@ def reflect_and_evolve(workflow, context):
                 "type": "action_notify",
                 "params": {"channel":"console", "message":"AutoOps Evo: remediation failed, manual review required"}
             })
-            snapshot_workflow("added_notify_after_failure")
+            snapshot_workflow("added_notify_after_failure", workflow)
             save_workflow(workflow)
             return {"evolved": True, "note": "added notify_admin step"}
     return {"evolved": False}
 
-# API models
+# API models (LogEvent documents the ingest payload shape; the hot path
+# below parses the raw body with orjson and skips pydantic validation)
 class LogEvent(BaseModel):
     service: str
     timestamp: float
@@ -132,15 +217,49 @@ class LogEvent(BaseModel):
     state: str = "ok"
 
 @app.post("/ingest_log")
-async def ingest_log(event: LogEvent):
-    # Append to window (sliding window)
-    METRICS["window"].append(event.dict())
-    METRICS["total_count"] += 1
-    if event.level.lower() == "error" or event.state=="crashed":
+async def ingest_log(request: Request):
+    try:
+        data = orjson.loads(await request.body())
+        metric = data.get("metric") or {}
+        lat = float(metric.get("latency_ms", 0))
+        level = data.get("level", "info")
+        state = data.get("state", "ok")
+        is_error = level.lower() == "error" or state == "crashed"
+    except (orjson.JSONDecodeError, AttributeError, TypeError, ValueError):
+        # anything that isn't the documented LogEvent shape — undecodable
+        # bytes, a non-dict body, null metric, non-string level, non-numeric
+        # latency — is the client's error, not ours
+        return Response(status_code=400)
+    # overwrite the oldest ring slot; once the buffer is full, the slot
+    # holds the evicted event — remove its contribution from the sums
+    i = METRICS["idx"]
+    if METRICS["n"] == WINDOW:
+        old_lat = float(METRICS["lat"][i])
+        METRICS["sum"] -= old_lat
+        METRICS["sumsq"] -= old_lat * old_lat
+    METRICS["lat"][i] = lat
+    METRICS["err"][i] = 1 if is_error else 0
+    METRICS["idx"] = (i + 1) % WINDOW
+    METRICS["n"] = min(METRICS["n"] + 1, WINDOW)
+    METRICS["sum"] += lat
+    METRICS["sumsq"] += lat * lat
+    if is_error:
         METRICS["error_count"] += 1
-    # keep window small (last 30 events)
-    if len(METRICS["window"]) > 30:
-        METRICS["window"].pop(0)
+    METRICS["total_count"] += 1
+    # EWMA update of the running mean/std from the current window stats
+    n = METRICS["n"]
+    mu_c = METRICS["sum"] / n
+    sigma_c = math.sqrt(max(METRICS["sumsq"] / n - mu_c * mu_c, 0.0))
+    if METRICS["total_count"] == 1:
+        METRICS["mu_r"] = mu_c
+        METRICS["sigma_r"] = sigma_c
+    else:
+        k = METRICS["k"]
+        if METRICS["adapt_left"] > 0:
+            k = K_FAST
+            METRICS["adapt_left"] -= 1
+        METRICS["mu_r"] = (1 - k) * METRICS["mu_r"] + k * mu_c
+        METRICS["sigma_r"] = (1 - k) * METRICS["sigma_r"] + k * sigma_c
     return {"received": True}
 
 @app.post("/run_cycle")
@@ -149,24 +268,32 @@ async def run_cycle():
     Force the agent to evaluate current metrics, detect anomaly, choose fix,
     execute, verify and reflect/evolve.
     """
-    workflow = load_workflow()
-    analysis = analyze_metrics(METRICS["window"])
+    # file I/O runs in a worker thread so the event loop keeps serving
+    # /ingest_log while a cycle is in flight
+    workflow = await asyncio.to_thread(load_workflow)
+    analysis = analyze_metrics()
     if not analysis.get("anomaly", False):
         return {"status":"no_anomaly", "analysis": analysis}
-    rc = root_cause_reasoning(analysis)
-    # choose action from workflow (simple mapping)
+    # choose action from workflow (dispatch table built at load time) and
+    # fire it as a task so the recovery round-trip overlaps the Python-side
+    # reasoning below
     action_taken = None
     action_detail = None
-    for step in workflow.get("steps", []):
-        if step["type"] == "action_restart_service":
-            action_taken = step["id"]
-            action_detail = execute_action(step["type"], step.get("params", {}))
-            break
-    # verify
-    verified = verify_recovery(workflow.get("steps")[-1].get("params", {}))
+    action_task = None
+    step = _WF_CACHE["by_type"].get("action_restart_service")
+    if step is not None:
+        action_taken = step["id"]
+        action_task = asyncio.create_task(execute_action(step["type"], step.get("params", {})))
+    rc = root_cause_reasoning(analysis)
+    if action_task is not None:
+        action_detail = await action_task
+    # verify — depends on the recovery having landed, so it stays sequential;
+    # yield once to let queued ingest events drain before the health probe
+    await asyncio.sleep(0)
+    verified = await verify_recovery(_WF_CACHE["last"].get("params", {}))
     success = action_detail.get("ok", False) and verified.get("ok", False)
     # reflect and possibly evolve workflow
-    evolve_result = reflect_and_evolve(workflow, {"reason": rc, "success": success})
+    evolve_result = await asyncio.to_thread(reflect_and_evolve, workflow, {"reason": rc, "success": success})
     # create a human readable reasoning chain
     reasoning_chain = {
         "analysis": analysis,
@@ -176,13 +303,19 @@ async def run_cycle():
         "verification": verified,
         "evolve": evolve_result
     }
-    # clear metrics after remediation attempt so repeated cycles are meaningful
-    METRICS["window"].clear()
-    METRICS["error_count"] = 0
-    METRICS["total_count"] = 0
-    return {"status":"remediation_ran", "reasoning": reasoning_chain}
+    # keep the running stats warm across cycles: mark the remediation with a
+    # generation bump (gen_mark fences off pre-remediation ring slots from
+    # the next analysis) and let the EWMA re-converge with a larger
+    # influence for the next window's worth of events instead of clearing
+    METRICS["generation"] += 1
+    METRICS["gen_mark"] = METRICS["total_count"]
+    METRICS["adapt_left"] = WINDOW
+    # serialize once with orjson instead of letting FastAPI re-encode the dict
+    return ORJSONResponse({"status":"remediation_ran", "reasoning": reasoning_chain})
 
 @app.get("/status")
 async def status():
-    wf = load_workflow()
-    return {"metrics": {"window_len": len(METRICS["window"])}, "workflow": wf}
+    await asyncio.to_thread(load_workflow)  # refreshes the cache if stale
+    body = (b'{"metrics":{"window_len":' + str(METRICS["n"]).encode()
+            + b'},"workflow":' + _WF_CACHE["blob"] + b'}')
+    return Response(content=body, media_type="application/json")
@@ -1,8 +1,13 @@
 # log_emitter.py
 import requests, time, random
+from requests.adapters import HTTPAdapter
 AGENT = "http://localhost:8000/ingest_log"
 SIM = "http://localhost:5001"
 
+# pooled session: reuse one keep-alive socket across the event burst
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+
 def send_event(level="info", state="ok", latency=100):
     payload = {
         "service": "sim-service",
@@ -13,7 +18,7 @@ def send_event(level="info", state="ok", latency=100):
         "state": state
     }
     try:
-        r = requests.post(AGENT, json=payload, timeout=1.0)
+        r = _SESSION.post(AGENT, json=payload, timeout=1.0)
         print("sent", payload, "->", r.status_code)
     except Exception as e:
         print("err", e)
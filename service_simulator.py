@@ -1,9 +1,27 @@
 # service_simulator.py
 from flask import Flask, jsonify
+from flask.json.provider import JSONProvider
 import threading, time, requests, os
+import orjson
+from requests.adapters import HTTPAdapter
 
 AGENT_URL = os.environ.get("AGENT_URL", "http://localhost:8000/ingest_log")
+
+class ORJSONProvider(JSONProvider):
+    """orjson-backed provider: every jsonify() call routes through it."""
+    def dumps(self, obj, **_):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **_):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+
+# pooled session: the heartbeat thread lives for the process, so every
+# post reuses the same keep-alive socket instead of reconnecting
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
 
 healthy = {"state": "ok"}
 
@@ -23,7 +41,7 @@ def emit_heartbeat():
             "state": healthy["state"]
         }
         try:
-            requests.post(AGENT_URL, json=payload, timeout=1.0)
+            _SESSION.post(AGENT_URL, json=payload, timeout=1.0)
         except Exception as e:
             # agent may be down during dev — ignore
             pass
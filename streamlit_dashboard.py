@@ -1,6 +1,7 @@
 # streamlit_dashboard.py
 import streamlit as st
-import requests, json, os, glob, time
+import requests, os, time
+import orjson
 
 AGENT = "http://localhost:8000"
 
@@ -18,11 +19,16 @@ if st.button("Trigger Run Cycle (Detect & Remediate)"):
     st.write(r.json())
 
 st.markdown("### Workflow Versions")
-files = sorted(glob.glob("workflow_versions/*.json"), reverse=True)
-if files:
-    for f in files[:10]:
-        st.write(f)
-        with open(f) as fh:
-            st.json(json.load(fh))
+# scandir avoids the extra stat calls glob makes per entry; names embed the
+# timestamp, so a name sort is newest-first
+entries = []
+if os.path.isdir("workflow_versions"):
+    entries = [e for e in os.scandir("workflow_versions") if e.name.endswith(".json")]
+    entries.sort(key=lambda e: e.name, reverse=True)
+if entries:
+    for e in entries[:10]:
+        st.write(e.path)
+        with open(e.path, "rb") as fh:
+            st.json(orjson.loads(fh.read()))
 else:
     st.write("No versions yet. Workflow will be snapshotted after evolve events.")